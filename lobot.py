@@ -409,6 +409,292 @@ def change_type(instance, region_name, available_instances):
     chosen_type = prompt.prompt(type_prompt)["type"].split(" :: ")[0]
     ec2.modify_instance_attribute(InstanceId=instance["InstanceId"], Attribute='instanceType', Value=chosen_type)
 
+def instances_lacking_type(instance_type, instance_ids, region_name):
+    """
+    Checks with AWS whether the given instance type is offered in the availability zone of each
+    given instance. Returns the ids of the instances whose zone does not offer the type.
+    """
+    ec2 = boto3.client("ec2", region_name=region_name)
+    zones = {}
+    for res in ec2.describe_instances(InstanceIds=instance_ids)["Reservations"]:
+        for inst in res["Instances"]:
+            zones[inst["InstanceId"]] = inst["Placement"]["AvailabilityZone"]
+    filters = [{"Name":"instance-type", "Values":[instance_type]},
+               {"Name":"location", "Values":sorted(set(zones.values()))}]
+    offerings = ec2.describe_instance_type_offerings(LocationType="availability-zone", Filters=filters)["InstanceTypeOfferings"]
+    offered_zones = [offering["Location"] for offering in offerings]
+    del ec2
+    return [instance_id for instance_id in instance_ids if zones.get(instance_id) not in offered_zones]
+
+def fetch_states(ec2, instance_ids):
+    """
+    Fetches the current state of many instances with a single request.
+    Maps each instance id to its state and the code of the reason for the last state change.
+    """
+    states = {}
+    for res in ec2.describe_instances(InstanceIds=instance_ids)["Reservations"]:
+        for inst in res["Instances"]:
+            states[inst["InstanceId"]] = (inst["State"]["Name"], inst.get("StateReason", {}).get("Code"))
+    return states
+
+def check_resize_permissions(ec2, stop_ids, resize_ids, target_type):
+    """
+    Dry-runs every call of the resize pipeline, so missing permissions show up before any
+    instance is stopped.
+    """
+    dry_runs = []
+    if len(stop_ids) > 0:
+        dry_runs.append(lambda: ec2.stop_instances(InstanceIds=stop_ids, DryRun=True))
+        dry_runs.append(lambda: ec2.start_instances(InstanceIds=stop_ids, DryRun=True))
+    for instance_id in resize_ids:
+        dry_runs.append(lambda instance_id=instance_id: ec2.modify_instance_attribute(InstanceId=instance_id, Attribute='instanceType', Value=target_type, DryRun=True))
+    for dry_run in dry_runs:
+        try:
+            dry_run()
+        except ClientError as e:
+            if 'DryRunOperation' not in str(e):
+                raise
+
+def send_signal(ec2_call, instance_ids, results):
+    """
+    Sends a START or STOP signal to many instances at once. If the batched request is rejected,
+    every instance is tried on its own, so one bad instance does not hold up the others.
+    Failures are written to 'results', the ids that received the signal are returned.
+    """
+    if len(instance_ids) == 0:
+        return []
+    try:
+        ec2_call(InstanceIds=instance_ids, DryRun=False)
+        return list(instance_ids)
+    except ClientError:
+        pass
+    signaled = []
+    for instance_id in instance_ids:
+        try:
+            ec2_call(InstanceIds=[instance_id], DryRun=False)
+            signaled.append(instance_id)
+        except ClientError as e:
+            results[instance_id] = "failed: "+str(e)
+    return signaled
+
+# Error codes EC2 answers with when it throttles requests
+THROTTLING_ERROR_CODES = ("RequestLimitExceeded", "Throttling", "ThrottlingException")
+
+def resize_instances(instances, target_type, region_name, poll_interval=5, max_polls=180, max_poll_errors=3, max_backoff=60):
+    """
+    Changes the type of many instances at once: stop -> modify type -> start.
+
+    All instances are stopped with one signal and their states are polled in batches. As soon as
+    a single instance is stopped, its type is changed and it is started again right away, so no
+    instance has to wait for the slowest one. Instances that were stopped beforehand are resized
+    but stay stopped.
+    If the type cannot be changed or the instance refuses to start with the new type, the old type
+    is restored (and the instance restarted if it was running). Returns a dictionary that maps
+    each instance id to its result.
+    Pending instances are skipped, they cannot be stopped yet. If polling times out or fails, the
+    instances that were stopped by this run are started again with their old type, or reported
+    as left stopped if the start is rejected.
+    Missing permissions raise a ClientError before any instance is stopped.
+    """
+    ec2 = boto3.client("ec2", region_name=region_name)
+    original_types = {inst["InstanceId"]:inst["InstanceType"] for inst in instances}
+    results = {}
+    restart = set()
+    to_stop = []
+    waiting_for_stop = set()
+    for inst in instances:
+        instance_id = inst["InstanceId"]
+        if inst["InstanceType"] == target_type:
+            results[instance_id] = "skipped: already "+target_type
+        elif inst["State"] in ("terminated", "shutting-down"):
+            results[instance_id] = "skipped: instance is "+inst["State"]
+        elif inst["State"] == "pending":
+            results[instance_id] = "skipped: instance is pending, try again once it is running"
+        else:
+            if inst["State"] == "running":
+                restart.add(instance_id)
+                to_stop.append(instance_id)
+            waiting_for_stop.add(instance_id)
+    check_resize_permissions(ec2, to_stop, sorted(waiting_for_stop), target_type)
+    stopped_ids = send_signal(ec2.stop_instances, to_stop, results)
+    waiting_for_stop -= set(to_stop) - set(stopped_ids)
+    if len(stopped_ids) > 0:
+        print("STOP signal sent to "+str(len(stopped_ids))+" instance(s), resizing each as soon as it is stopped ...")
+    waiting_for_start = set()
+    rolled_back = set()
+    # A poll shortly after START may still read 'stopped'. Only a reading of 'stopped' after the
+    # instance was seen booting, or with a new state reason, means that the start failed.
+    booting = set()
+    reason_at_start = {}
+
+    def roll_back(instance_id):
+        # Restores the original type and returns True if the instance should be started again
+        rolled_back.add(instance_id)
+        try:
+            ec2.modify_instance_attribute(InstanceId=instance_id, Attribute='instanceType', Value=original_types[instance_id])
+        except ClientError as e:
+            results[instance_id] += ", rollback failed: "+str(e)
+            return False
+        results[instance_id] += ", rolled back to "+original_types[instance_id]
+        return instance_id in restart
+
+    def start(instance_ids, states):
+        for instance_id in instance_ids:
+            booting.discard(instance_id)
+            reason_at_start[instance_id] = states[instance_id][1]
+        failures = {}
+        started = send_signal(ec2.start_instances, instance_ids, failures)
+        waiting_for_start.update(started)
+        return failures
+
+    polls = 0
+    poll_errors = 0
+    throttled_polls = 0
+    interrupted = None
+    while (len(waiting_for_stop) > 0 or len(waiting_for_start) > 0) and polls < max_polls:
+        polls += 1
+        try:
+            states = fetch_states(ec2, list(waiting_for_stop | waiting_for_start))
+            poll_errors = 0
+            throttled_polls = 0
+        except ClientError as e:
+            if e.response["Error"]["Code"] in THROTTLING_ERROR_CODES:
+                # Polling many instances may get throttled, back off and try again
+                throttled_polls += 1
+                time.sleep(min(poll_interval * 2**throttled_polls, max_backoff))
+                continue
+            poll_errors += 1
+            if poll_errors >= max_poll_errors:
+                interrupted = str(e)
+                break
+            time.sleep(poll_interval)
+            continue
+        to_start = []
+        for instance_id in list(waiting_for_stop | waiting_for_start):
+            if states.get(instance_id, ("terminated", None))[0] in ("terminated", "shutting-down"):
+                waiting_for_stop.discard(instance_id)
+                waiting_for_start.discard(instance_id)
+                results[instance_id] = "failed: instance was terminated"
+        for instance_id in list(waiting_for_stop):
+            if states[instance_id][0] != "stopped":
+                continue
+            waiting_for_stop.remove(instance_id)
+            try:
+                ec2.modify_instance_attribute(InstanceId=instance_id, Attribute='instanceType', Value=target_type)
+                results[instance_id] = "resized to "+target_type
+                if instance_id in restart:
+                    to_start.append(instance_id)
+            except ClientError as e:
+                # Type was not changed, bring the instance back the way it was
+                results[instance_id] = "failed: "+str(e)
+                rolled_back.add(instance_id)
+                if instance_id in restart:
+                    to_start.append(instance_id)
+        for instance_id in list(waiting_for_start):
+            state, reason = states[instance_id]
+            if state in ("pending", "running"):
+                booting.add(instance_id)
+            if state == "running":
+                waiting_for_start.remove(instance_id)
+            elif state == "stopped" and (instance_id in booting or reason != reason_at_start[instance_id]):
+                # START was accepted, but the instance fell back to 'stopped' (e.g. no capacity for the new type)
+                waiting_for_start.remove(instance_id)
+                if instance_id in rolled_back:
+                    results[instance_id] += ", could not be started again"
+                else:
+                    results[instance_id] = "failed: could not start as "+target_type
+                    if roll_back(instance_id):
+                        to_start.append(instance_id)
+        for instance_id, reason in start(to_start, states).items():
+            if instance_id in rolled_back:
+                results[instance_id] += ", could not be started again: "+reason
+            else:
+                results[instance_id] = reason
+                if roll_back(instance_id):
+                    for retry_reason in start([instance_id], states).values():
+                        results[instance_id] += ", could not be started again: "+retry_reason
+        if len(waiting_for_stop) > 0 or len(waiting_for_start) > 0:
+            time.sleep(poll_interval)
+    if interrupted is None:
+        interrupted = "timed out"
+    else:
+        interrupted = "state polling failed ("+interrupted+")"
+    for instance_id in waiting_for_stop:
+        results[instance_id] = interrupted+" while stopping, type not changed"
+    # Do not leave instances stopped that this run has stopped
+    restart_failures = {}
+    for instance_id in send_signal(ec2.start_instances, sorted(waiting_for_stop & restart), restart_failures):
+        results[instance_id] += ", START sent again"
+    for instance_id, reason in restart_failures.items():
+        results[instance_id] += ", left STOPPED, start it manually ("+reason+")"
+    for instance_id in waiting_for_start:
+        results[instance_id] += " ("+interrupted+" while starting)"
+    del ec2
+    return results
+
+def change_type_batch(instances, region_name, available_instances):
+    """
+    This creates prompts to change the type of several instances at once.
+    Running instances are stopped, resized and started again, see 'resize_instances'.
+    """
+    instance_choices = [{'name': inst["InstanceId"]+" :: ("+inst["State"]+", "+inst["InstanceType"]+", "+inst["Name"]+")"}
+                        for inst in instances if inst["State"] not in ("terminated", "shutting-down", "pending")]
+    if len(instance_choices) == 0:
+        print("No instances to resize.")
+        return
+    instances_prompt = {
+        'type': 'checkbox',
+        'name': 'instances',
+        'message': 'Which instances do you want to resize?',
+        'choices': instance_choices
+    }
+    chosen_ids = [choice.split(" :: ")[0] for choice in prompt.prompt(instances_prompt)["instances"]]
+    chosen_instances = [inst for inst in instances if inst["InstanceId"] in chosen_ids]
+    if len(chosen_instances) == 0:
+        print(" ----> No instance chosen, canceling.")
+        return
+    choices = [k+" :: "+v for k, v in available_instances.items()]
+    type_prompt = {
+         'type': 'list',
+         'name': 'type',
+         'message': 'Which type do you want for the '+str(len(chosen_instances))+' chosen instance(s)?',
+         'choices': choices
+     }
+    chosen_type = prompt.prompt(type_prompt)["type"].split(" :: ")[0]
+    # Check the type before stopping anything
+    try:
+        lacking_ids = instances_lacking_type(chosen_type, chosen_ids, region_name)
+    except ClientError as e:
+        print("\nType "+chosen_type+" could not be checked, nothing was changed:\n"+str(e))
+        return
+    if len(lacking_ids) > 0:
+        print("------> Type "+chosen_type+" is not offered in the availability zone of "+", ".join(lacking_ids)+". Nothing was changed.")
+        return
+    running_names = [inst["Name"] for inst in chosen_instances if inst["State"] == "running" and inst["InstanceType"] != chosen_type]
+    if len(running_names) > 0:
+        confirm_prompt =     {
+            'type': 'confirm',
+            'message': 'This will stop and restart '+str(len(running_names))+' running instance(s) ('+", ".join(running_names)+'). Continue?',
+            'name': 'resize',
+            'default': False,
+        }
+        chosen_confirmation = prompt.prompt(confirm_prompt)["resize"]
+        if not chosen_confirmation:
+            print(" ----> Canceling.")
+            return
+    try:
+        results = resize_instances(chosen_instances, chosen_type, region_name=region_name)
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "UnauthorizedOperation":
+            print("\nMissing permissions, nothing was changed:\n"+str(e))
+        else:
+            print("\nResize aborted, nothing was changed:\n"+str(e))
+        return
+    result_table = PrettyTable(["InstanceId", "Name", "Old type", "Result"])
+    for inst in chosen_instances:
+        result_table.add_row([inst["InstanceId"], inst["Name"], inst["InstanceType"], results[inst["InstanceId"]]])
+    print(result_table)
+
 def change_name(instance, region_name):
     """
     This creates a prompt for the new name-tag of an instance and changes the name when provided.
@@ -511,11 +797,11 @@ def ask_instance(instances):
     Creates the prompt for picking from the list of instances available in the current region.
     """
     sorted_list = sorted(instances, key=lambda x: x["State"])
-    choices = [inst["InstanceId"]+" :: ("+inst["State"]+", "+inst["Name"]+")" for inst in sorted_list] + ["Change region", "Change username (SSH)"]
+    choices = [inst["InstanceId"]+" :: ("+inst["State"]+", "+inst["Name"]+")" for inst in sorted_list] + ["Resize instances", "Change region", "Change username (SSH)"]
     instance_prompt = {
         'type': 'list',
         'name': 'instance',
-        'message': 'Choose instance, change region, or change SSH username:',
+        'message': 'Choose instance, resize instances, change region, or change SSH username:',
         'choices': choices
     }
     answer = prompt.prompt(instance_prompt)['instance'].split(" :: ")[0]
@@ -612,6 +898,8 @@ if __name__ == "__main__":
             GLOBAL_CONFIG["aws_region"] = change_region(current_region_name=client_region_name)
             time.sleep(1)
             continue
+        elif chosen_instance == "Resize instances":
+            change_type_batch(instances, region_name=client_region_name, available_instances=recommended_instance_types)
         elif chosen_instance == "Change username (SSH)":
             change_remote_username()
             time.sleep(1)
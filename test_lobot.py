@@ -0,0 +1,205 @@
+"""
+Tests for the resize pipeline of lobot, run against a fake EC2 client.
+"""
+import sys
+import types
+
+import pytest
+
+pytest.importorskip("boto3")
+
+# The resize pipeline does not prompt, so the UI dependencies are not needed to test it
+for module_name, attributes in (("PyInquirer", ("style_from_dict", "prompt")), ("prettytable", ("PrettyTable",))):
+    try:
+        __import__(module_name)
+    except ImportError:
+        module = types.ModuleType(module_name)
+        for attribute in attributes:
+            setattr(module, attribute, None)
+        sys.modules[module_name] = module
+
+from botocore.exceptions import ClientError
+
+import lobot
+
+
+def client_error(code, operation):
+    return ClientError({"Error": {"Code": code, "Message": code}}, operation)
+
+
+class FakeEC2:
+    """
+    Minimal stand-in for the boto3 EC2 client. States advance by one step on every
+    describe_instances call, e.g. 'stopping' -> 'stopped' and 'pending' -> 'running'.
+    A stop takes 'stop_polls' calls (0 stops at once), the first calls of describe_instances fail with 'poll_errors'.
+    """
+    def __init__(self, instances, unsupported_types=(), no_capacity_types=(), denied=(), stale_reads=0,
+                 stop_polls=1, poll_errors=()):
+        self.states = {i: state for i, (state, _) in instances.items()}
+        self.types = {i: instance_type for i, (_, instance_type) in instances.items()}
+        self.reasons = {i: None for i in instances}
+        self.unsupported_types = unsupported_types
+        self.no_capacity_types = no_capacity_types
+        self.denied = denied
+        self.stale_reads = stale_reads
+        self.stale = {}
+        self.stop_polls = stop_polls
+        self.stopping = {}
+        self.poll_errors = list(poll_errors)
+
+    def check(self, operation, dry_run):
+        if operation in self.denied:
+            raise client_error("UnauthorizedOperation", operation)
+        if dry_run:
+            raise client_error("DryRunOperation", operation)
+
+    def stop_instances(self, InstanceIds, DryRun):
+        self.check("StopInstances", DryRun)
+        for instance_id in InstanceIds:
+            if self.states[instance_id] != "running":
+                raise client_error("IncorrectInstanceState", "StopInstances")
+        for instance_id in InstanceIds:
+            self.states[instance_id] = "stopping" if self.stop_polls > 0 else "stopped"
+            self.stopping[instance_id] = self.stop_polls
+            self.reasons[instance_id] = "Client.UserInitiatedShutdown"
+
+    def start_instances(self, InstanceIds, DryRun):
+        self.check("StartInstances", DryRun)
+        for instance_id in InstanceIds:
+            if self.states[instance_id] != "stopped":
+                raise client_error("IncorrectInstanceState", "StartInstances")
+        for instance_id in InstanceIds:
+            if self.stale_reads > 0:
+                self.stale[instance_id] = self.stale_reads
+            self.states[instance_id] = "pending"
+
+    def modify_instance_attribute(self, InstanceId, Attribute, Value, DryRun=False):
+        self.check("ModifyInstanceAttribute", DryRun)
+        if self.states[InstanceId] != "stopped":
+            raise client_error("IncorrectInstanceState", "ModifyInstanceAttribute")
+        if Value in self.unsupported_types:
+            raise client_error("Unsupported", "ModifyInstanceAttribute")
+        self.types[InstanceId] = Value
+
+    def describe_instances(self, InstanceIds):
+        if len(self.poll_errors) > 0:
+            raise client_error(self.poll_errors.pop(0), "DescribeInstances")
+        instances = []
+        for instance_id in InstanceIds:
+            if self.stale.get(instance_id, 0) > 0:
+                self.stale[instance_id] -= 1
+                instances.append({"InstanceId": instance_id, "State": {"Name": "stopped"},
+                                  "StateReason": {"Code": self.reasons[instance_id]}})
+                continue
+            instances.append({"InstanceId": instance_id, "State": {"Name": self.states[instance_id]},
+                              "StateReason": {"Code": self.reasons[instance_id]}})
+            if self.states[instance_id] == "stopping":
+                self.stopping[instance_id] -= 1
+                if self.stopping[instance_id] == 0:
+                    self.states[instance_id] = "stopped"
+            elif self.states[instance_id] == "pending":
+                if self.types[instance_id] in self.no_capacity_types:
+                    self.states[instance_id] = "stopped"
+                    self.reasons[instance_id] = "Server.InsufficientInstanceCapacity"
+                else:
+                    self.states[instance_id] = "running"
+        return {"Reservations": [{"Instances": instances}]}
+
+
+@pytest.fixture
+def resize(monkeypatch):
+    monkeypatch.setattr(lobot.time, "sleep", lambda seconds: None)
+
+    def run(ec2, instances, target_type="m5.large", **kwargs):
+        monkeypatch.setattr(lobot.boto3, "client", lambda *args, **kwargs: ec2)
+        listed = [{"InstanceId": i, "State": state, "InstanceType": instance_type}
+                  for i, (state, instance_type) in instances.items()]
+        return lobot.resize_instances(listed, target_type, region_name="us-east-1", **kwargs)
+    return run
+
+
+def test_resize_restarts_running_and_keeps_stopped(resize):
+    instances = {"i-1": ("running", "t3.nano"), "i-2": ("stopped", "t3.nano"), "i-3": ("running", "m5.large")}
+    ec2 = FakeEC2(instances)
+    results = resize(ec2, instances)
+    assert results == {"i-1": "resized to m5.large", "i-2": "resized to m5.large", "i-3": "skipped: already m5.large"}
+    assert ec2.states == {"i-1": "running", "i-2": "stopped", "i-3": "running"}
+    assert ec2.types == {"i-1": "m5.large", "i-2": "m5.large", "i-3": "m5.large"}
+
+
+def test_failed_type_change_restarts_with_old_type(resize):
+    instances = {"i-1": ("running", "t3.nano")}
+    ec2 = FakeEC2(instances, unsupported_types=("m5.large",))
+    results = resize(ec2, instances)
+    assert results["i-1"].startswith("failed:")
+    assert ec2.states["i-1"] == "running"
+    assert ec2.types["i-1"] == "t3.nano"
+
+
+def test_failed_start_rolls_back(resize):
+    instances = {"i-1": ("running", "t3.nano"), "i-2": ("running", "t3.nano")}
+    ec2 = FakeEC2(instances, no_capacity_types=("m5.large",))
+    results = resize(ec2, instances)
+    for instance_id in instances:
+        assert results[instance_id] == "failed: could not start as m5.large, rolled back to t3.nano"
+        assert ec2.states[instance_id] == "running"
+        assert ec2.types[instance_id] == "t3.nano"
+
+
+def test_stale_stopped_read_is_not_a_failed_start(resize):
+    instances = {"i-1": ("running", "t3.nano"), "i-2": ("running", "t3.nano")}
+    ec2 = FakeEC2(instances, stale_reads=1)
+    results = resize(ec2, instances)
+    assert results == {"i-1": "resized to m5.large", "i-2": "resized to m5.large"}
+    assert ec2.states == {"i-1": "running", "i-2": "running"}
+
+
+def test_missing_start_permission_stops_nothing(resize):
+    instances = {"i-1": ("running", "t3.nano")}
+    ec2 = FakeEC2(instances, denied=("StartInstances",))
+    with pytest.raises(ClientError):
+        resize(ec2, instances)
+    assert ec2.states["i-1"] == "running"
+    assert ec2.types["i-1"] == "t3.nano"
+
+
+def test_pending_instance_is_skipped(resize):
+    instances = {"i-1": ("pending", "t3.nano")}
+    ec2 = FakeEC2(instances)
+    results = resize(ec2, instances)
+    assert results["i-1"].startswith("skipped: instance is pending")
+    assert ec2.states["i-1"] == "pending"
+
+
+def test_throttled_polls_are_retried(resize):
+    instances = {"i-1": ("running", "t3.nano")}
+    ec2 = FakeEC2(instances, poll_errors=["RequestLimitExceeded"] * 5)
+    results = resize(ec2, instances)
+    assert results == {"i-1": "resized to m5.large"}
+    assert ec2.states["i-1"] == "running"
+
+
+def test_failed_polling_does_not_leave_instance_stopped(resize):
+    instances = {"i-1": ("running", "t3.nano")}
+    ec2 = FakeEC2(instances, stop_polls=0, poll_errors=["InternalError"] * 3)
+    results = resize(ec2, instances)
+    assert results["i-1"].startswith("state polling failed")
+    assert results["i-1"].endswith("START sent again")
+    assert ec2.states["i-1"] == "pending"
+    assert ec2.types["i-1"] == "t3.nano"
+
+
+def test_timeout_reports_instance_left_stopped(resize):
+    instances = {"i-1": ("running", "t3.nano")}
+    ec2 = FakeEC2(instances, stop_polls=5)
+    results = resize(ec2, instances, max_polls=2)
+    assert results["i-1"].startswith("timed out while stopping, type not changed, left STOPPED, start it manually")
+    assert ec2.types["i-1"] == "t3.nano"
+
+
+def test_timeout_restarts_stopped_instance(resize):
+    instances = {"i-1": ("running", "t3.nano")}
+    ec2 = FakeEC2(instances)
+    results = resize(ec2, instances, max_polls=1)
+    assert results["i-1"] == "timed out while stopping, type not changed, START sent again"
+    assert ec2.states["i-1"] == "pending"